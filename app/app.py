@@ -1,5 +1,8 @@
+from a2wsgi import WSGIMiddleware
 from flask import Flask, request, jsonify
+from flask.json.provider import JSONProvider
 from flask_cors import CORS
+import orjson
 import os
 import sys
 
@@ -7,11 +10,28 @@ import sys
 # This allows 'inference' to be imported directly
 sys.path.append(os.path.dirname(__file__))
 
-from inference import predict_scam
+from inference import predict_scam, predict_scam_batch
+
+class OrjsonProvider(JSONProvider):
+    """
+    Flask JSON provider backed by orjson, so `jsonify` and `request.get_json()`
+    serialize/parse in C instead of the stdlib `json` module.
+    """
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
 
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
+# Reject oversized request bodies (413) before they are parsed
+app.config['MAX_CONTENT_LENGTH'] = int(os.environ.get('MAX_CONTENT_LENGTH', 1024 * 1024))
 CORS(app) # Enable CORS for all routes
 
+# Upper bound on messages accepted by /predict_batch in a single request
+MAX_BATCH_SIZE = int(os.environ.get('MAX_BATCH_SIZE', 1000))
+
 @app.route('/', methods=['GET'])
 def root():
     """
@@ -22,7 +42,8 @@ def root():
         "status": "running",
         "endpoints": {
             "/health": "GET",
-            "/predict": "POST"
+            "/predict": "POST",
+            "/predict_batch": "POST"
         }
     }), 200
 
@@ -45,6 +66,9 @@ def predict():
         return jsonify({"error": "Request must be JSON"}), 400
 
     data = request.get_json()
+    if not isinstance(data, dict):
+        return jsonify({"error": "Request body must be a JSON object"}), 400
+
     message = data.get('message')
 
     if not message:
@@ -69,11 +93,57 @@ def predict():
             "reason": f"An internal error occurred: {str(e)}. Defaulted to SAFE."
         }), 500
 
+@app.route('/predict_batch', methods=['POST'])
+def predict_batch():
+    """
+    Batch prediction endpoint for scam text detection.
+    Expects a JSON payload with a 'messages' field (list of strings).
+    Returns: JSON containing a 'results' list, one entry per message in input order.
+    """
+    if not request.is_json:
+        return jsonify({"error": "Request must be JSON"}), 400
+
+    data = request.get_json()
+    if not isinstance(data, dict):
+        return jsonify({"error": "Request body must be a JSON object"}), 400
+
+    messages = data.get('messages')
+
+    if messages is None:
+        return jsonify({"error": "Missing 'messages' field in request body"}), 400
+
+    if messages == []:
+        return jsonify({"error": "'messages' field must not be empty"}), 400
+
+    if not isinstance(messages, list) or not all(isinstance(m, str) for m in messages):
+        return jsonify({"error": "'messages' field must be a list of strings"}), 400
+
+    if len(messages) > MAX_BATCH_SIZE:
+        return jsonify({"error": f"'messages' must contain at most {MAX_BATCH_SIZE} items"}), 400
+
+    try:
+        results = predict_scam_batch(messages)
+        return jsonify({
+            "results": [
+                {"prediction": label, "confidence": confidence, "reason": reason}
+                for label, confidence, reason in results
+            ]
+        }), 200
+    except Exception as e:
+        app.logger.error(f"Batch prediction error for {len(messages)} messages: {e}", exc_info=True)
+        return jsonify({"error": f"An internal error occurred: {str(e)}"}), 500
+
+# ASGI entry point for uvicorn (uvloop event loop + httptools C HTTP parser):
+#   uvicorn app.app:asgi_app --workers 4 --loop uvloop --http httptools
+# a2wsgi runs each request on a thread pool of ASGI_THREADS threads per worker,
+# so requests in one process are handled concurrently.
+asgi_app = WSGIMiddleware(app, workers=int(os.environ.get('ASGI_THREADS', 10)))
+
 if __name__ == '__main__':
     print("INFO: Flask application starting...")
-    print("INFO: Routes registered: /health (GET), /predict (POST)")
+    print("INFO: Routes registered: /health (GET), /predict (POST), /predict_batch (POST)")
     # Get port from environment variable, default to 5000
     port = int(os.environ.get('PORT', 5000))
-    # In a production environment, you might use a production-ready WSGI server like Gunicorn
-    # For local development, app.run() is sufficient.
+    # For local development only; in production run under Gunicorn:
+    #   gunicorn -c gunicorn_conf.py app.app:app
     app.run(debug=False, host='0.0.0.0', port=port)
\ No newline at end of file
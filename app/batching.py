@@ -0,0 +1,82 @@
+# scam_text_api/app/batching.py
+
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent single-item calls into one batched call.
+
+    Callers `submit` one item and block on the returned future; a background
+    thread collects up to `batch_size` items (waiting at most `max_latency`
+    seconds after the first one arrives), runs `batch_fn` on the whole list
+    once, and hands each caller its own result. Same idea as
+    `service_streamer.ThreadedStreamer`, without the extra dependency.
+    """
+
+    def __init__(self, batch_fn, batch_size=32, max_latency=0.01):
+        self.batch_fn = batch_fn
+        self.batch_size = batch_size
+        self.max_latency = max_latency
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker_pid = None
+
+    def submit(self, item):
+        """
+        Queues one item and returns a Future resolving to its result.
+        """
+        self._ensure_worker()
+        future = Future()
+        self._queue.put((item, future))
+        return future
+
+    def predict(self, item):
+        """
+        Blocking convenience wrapper around `submit`.
+        """
+        return self.submit(item).result()
+
+    def _ensure_worker(self):
+        # Threads do not survive fork(), so the worker is started lazily in the
+        # process that actually serves requests (e.g. each Gunicorn worker).
+        if self._worker_pid == os.getpid():
+            return
+        with self._lock:
+            if self._worker_pid == os.getpid():
+                return
+            self._queue = queue.Queue()
+            threading.Thread(target=self._run, args=(self._queue,), daemon=True).start()
+            self._worker_pid = os.getpid()
+
+    def _run(self, pending):
+        while True:
+            batch = [pending.get()]
+            deadline = time.monotonic() + self.max_latency
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(pending.get(timeout=timeout))
+                except queue.Empty:
+                    break
+
+            items = [item for item, _ in batch]
+            try:
+                results = self.batch_fn(items)
+                if len(results) != len(batch):
+                    raise ValueError(
+                        f"batch_fn returned {len(results)} results for {len(batch)} items"
+                    )
+            except Exception as e:
+                # Every caller must be released, or its thread blocks forever
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
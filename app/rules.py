@@ -1,6 +1,10 @@
 # scam_text_api/app/rules.py
 
-import re
+import os
+import string
+from functools import lru_cache
+
+import ahocorasick
 
 # Raw phrase lists (readable forms). We'll normalize them below so matching
 # behavior follows the same preprocessing used in inference.
@@ -56,23 +60,73 @@ RAW_GENUINE_MESSAGES = {
     "invoice received",
 }
 
+class _StripTable(dict):
+    """
+    `str.translate` table that keeps lowercase ASCII letters and whitespace
+    and deletes every other character. Code points outside the prebuilt
+    Latin-1 range are resolved on demand so behaviour matches `[^a-z\\s]`.
+    """
+    def __missing__(self, codepoint):
+        return codepoint if chr(codepoint).isspace() else None
+
+_KEEP = set(string.ascii_lowercase)
+_STRIP_TABLE = _StripTable(
+    (c, c if chr(c) in _KEEP or chr(c).isspace() else None) for c in range(256)
+)
+
+# ASCII fast path: a single `bytes.translate` lowercases, deletes everything but
+# letters and whitespace, and maps the \x1c-\x1f separators (whitespace to
+# `str.split` but not to `bytes.split`) to spaces.
+_ASCII_SEPARATORS = bytes(c for c in range(128) if chr(c).isspace() and not bytes([c]).isspace())
+_ASCII_TABLE = bytes.maketrans(
+    string.ascii_uppercase.encode() + _ASCII_SEPARATORS,
+    string.ascii_lowercase.encode() + b' ' * len(_ASCII_SEPARATORS),
+)
+_ASCII_DELETE = bytes(
+    c for c in range(128) if not (chr(c) in string.ascii_letters or chr(c).isspace())
+)
+
+
+# Only texts up to this length are memoized, so the cache can't be filled with
+# arbitrarily large client-chosen strings. Shared with the prediction cache in
+# `inference.py`.
+MAX_CACHED_MESSAGE_LENGTH = int(os.environ.get('MAX_CACHED_MESSAGE_LENGTH', 512))
+
 
 def normalize_text(text: str) -> str:
     """
     Normalize text for matching: lowercase, remove non-alpha characters,
-    collapse whitespace, and strip. Mirrors `preprocess_message` logic.
+    collapse whitespace, and strip. Also used as `inference.preprocess_message`,
+    so rule matching and the ML model see the same text.
+
+    `text` must be a str; callers (the Flask handlers) validate input types.
     """
-    if not isinstance(text, str):
-        return ""
+    if len(text) <= MAX_CACHED_MESSAGE_LENGTH:
+        return _normalize_cached(text)
+    return _normalize(text)
+
+
+def _normalize(text: str) -> str:
+    if text.isascii():
+        return b' '.join(text.encode().translate(_ASCII_TABLE, _ASCII_DELETE).split()).decode()
     text = text.lower()
-    text = re.sub(r'[^a-z\s]', '', text)
-    text = re.sub(r'\s+', ' ', text).strip()
+    text = text.translate(_STRIP_TABLE)
+    text = ' '.join(text.split())
     return text
 
 
+_normalize_cached = lru_cache(maxsize=4096)(_normalize)
+
+
 # Precompute normalized sets for fast matching
-GREETINGS = {normalize_text(g) for g in RAW_GREETINGS}
-GENUINE_MESSAGES = {normalize_text(p) for p in RAW_GENUINE_MESSAGES}
+GREETINGS = frozenset(normalize_text(g) for g in RAW_GREETINGS)
+GENUINE_MESSAGES = frozenset(normalize_text(p) for p in RAW_GENUINE_MESSAGES)
+
+# Words that may be freely combined into a greeting, e.g. "hi good morning"
+GREETING_WORDS = frozenset({
+    "hi", "hii", "hello", "hey", "morning", "afternoon", "evening", "good",
+    "night", "how", "are", "you", "r", "u", "there"
+})
 
 # Common scam keywords that should not be classified as SAFE even if short
 SCAM_KEYWORDS = {
@@ -82,14 +136,46 @@ SCAM_KEYWORDS = {
     "reward", "free", "congratulations", "confirm", "update"
 }
 
+
+# Match categories stored as automaton payloads
+_GENUINE = "genuine"
+_SCAM = "scam"
+
+
+def _build_automaton():
+    """
+    Builds one Aho-Corasick automaton over the genuine phrases and scam
+    keywords, so a single linear scan finds hits from both lists instead of one
+    substring search per phrase. Each match carries its category as payload.
+    """
+    automaton = ahocorasick.Automaton()
+    for keyword in SCAM_KEYWORDS:
+        automaton.add_word(keyword, _SCAM)
+    # Added last so a phrase in both lists ("congratulations") is tagged genuine,
+    # matching the rule order below where the genuine check wins.
+    for phrase in GENUINE_MESSAGES:
+        automaton.add_word(phrase, _GENUINE)
+    automaton.make_automaton()
+    return automaton
+
+
+_AUTOMATON = _build_automaton()
+
+
 def apply_rules(text: str) -> tuple[str, float] | None:
     """
     Applies rule-based overrides to the input text.
     Returns (label, confidence) if a rule is triggered, otherwise None.
     """
     # Normalize input the same way stored phrases are normalized
-    normalized_text = normalize_text(text)
+    return apply_rules_normalized(normalize_text(text))
+
 
+def apply_rules_normalized(normalized_text: str) -> tuple[str, float] | None:
+    """
+    Same as `apply_rules`, for text that has already been through
+    `normalize_text` (lets callers reuse the normalized string).
+    """
     # Rule-based override: Greetings (checked first for highest priority)
     if normalized_text in GREETINGS:
         return "SAFE", 0.99
@@ -97,23 +183,24 @@ def apply_rules(text: str) -> tuple[str, float] | None:
     # Check if the message contains greeting words combined with other greetings
     # This handles cases like "hi good morning" even if not in exact list
     words = normalized_text.split()
-    greeting_words = {"hi", "hii", "hello", "hey", "morning", "afternoon", "evening", "good", 
-                      "night", "how", "are", "you", "r", "u", "there"}
-    if len(words) <= 6 and all(word in greeting_words for word in words):
+    if len(words) <= 6 and GREETING_WORDS.issuperset(words):
         return "SAFE", 0.99
 
-    # Rule-based override: Common genuine messages
-    # If the message matches or contains a known benign phrase, mark SAFE
-    for phrase in GENUINE_MESSAGES:
-        if phrase in normalized_text:
+    # One pass over the text for both genuine phrases and scam keywords
+    has_scam_keyword = False
+    for _, category in _AUTOMATON.iter(normalized_text):
+        # Rule-based override: Common genuine messages
+        # If the message matches or contains a known benign phrase, mark SAFE
+        if category == _GENUINE:
             return "SAFE", 0.99
+        has_scam_keyword = True
 
     # Rule-based override: Single-word or very short messages
     # This rule is for non-greeting short messages, e.g., "cool", "nope", "yeah"
     # But exclude messages with scam keywords
-    if len(normalized_text.split()) <= 3 or len(normalized_text) < MIN_SAFE_LENGTH:
+    if len(words) <= 3 or len(normalized_text) < MIN_SAFE_LENGTH:
         # Check if it contains scam keywords
-        if any(keyword in normalized_text for keyword in SCAM_KEYWORDS):
+        if has_scam_keyword:
             return None  # Let the model decide
         # Otherwise, classify as SAFE
         return "SAFE", 0.98
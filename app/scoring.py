@@ -0,0 +1,122 @@
+# scam_text_api/app/scoring.py
+
+import math
+
+import numpy as np
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+
+# sklearn's default token pattern; on `normalize_text` output (a-z words separated
+# by single spaces) it yields the same tokens as `str.split()`, minus one-letter
+# words, which can never be in the vocabulary.
+_DEFAULT_TOKEN_PATTERN = r"(?u)\b\w\w+\b"
+
+
+def _check_supported(vectorizer):
+    # Everything here relies on the configuration the shipped vectorizer uses:
+    # word analyzer, default tokenization, unigrams, raw term counts, L2 norm.
+    if not isinstance(vectorizer, TfidfVectorizer):
+        raise ValueError("Fused scoring only supports a TfidfVectorizer")
+    if (vectorizer.analyzer != 'word' or vectorizer.ngram_range != (1, 1)
+            or vectorizer.binary or vectorizer.sublinear_tf or vectorizer.norm != 'l2'):
+        raise ValueError("Fused scoring only supports word-unigram, L2-normalized TF-IDF features")
+    if (vectorizer.tokenizer is not None or vectorizer.preprocessor is not None
+            or vectorizer.token_pattern != _DEFAULT_TOKEN_PATTERN):
+        raise ValueError("Fused scoring only supports the default preprocessor, tokenizer and token pattern")
+
+
+def _idf(vectorizer):
+    if vectorizer.use_idf:
+        return [float(w) for w in vectorizer.idf_]
+    return [1.0] * len(vectorizer.vocabulary_)
+
+
+def build_term_weights(vectorizer, model):
+    """
+    Folds a fitted word-unigram TfidfVectorizer and a binary linear model into
+    one lookup table: term -> (idf, idf * coef).
+
+    Raises ValueError for vectorizer or model configurations it can't reproduce.
+    """
+    _check_supported(vectorizer)
+    if len(model.classes_) != 2:
+        raise ValueError("Fused scoring only supports binary classifiers")
+
+    coef = model.coef_[0]
+    idf = _idf(vectorizer)
+    return {
+        term: (idf[i], idf[i] * float(coef[i]))
+        for term, i in vectorizer.vocabulary_.items()
+    }
+
+
+def build_term_index(vectorizer):
+    """
+    Lookup table for `vectorize_batch`: term -> (column index, idf).
+
+    Raises ValueError for vectorizer configurations it can't reproduce.
+    """
+    _check_supported(vectorizer)
+    idf = _idf(vectorizer)
+    return {term: (i, idf[i]) for term, i in vectorizer.vocabulary_.items()}
+
+
+def vectorize_batch(preprocessed_messages, term_index, n_features, dtype=np.float32):
+    """
+    Builds the TF-IDF CSR matrix for preprocessed messages directly from
+    `term_index`, equivalent to `vectorizer.transform` but without its regex
+    tokenizer, stop-word pass and separate TfidfTransformer step.
+
+    Messages must be output of `normalize_text`; see `score_message`.
+    """
+    indptr = [0]
+    indices = []
+    data = []
+    for message in preprocessed_messages:
+        counts = {}
+        for token in message.split():
+            entry = term_index.get(token)
+            if entry is not None:
+                counts[entry] = counts.get(entry, 0) + 1
+
+        weights = [count * idf for (_, idf), count in counts.items()]
+        norm = math.sqrt(sum(w * w for w in weights))
+        indices.extend(i for i, _ in counts)
+        data.extend(w / norm for w in weights)
+        indptr.append(len(indices))
+
+    return sp.csr_matrix(
+        (np.array(data, dtype=dtype), np.array(indices, dtype=np.int32), np.array(indptr, dtype=np.int32)),
+        shape=(len(preprocessed_messages), n_features),
+        copy=False,
+    )
+
+
+def score_message(preprocessed_message, term_weights, intercept):
+    """
+    Computes the positive-class probability for one preprocessed message
+    directly from `term_weights`, without building a sparse matrix.
+
+    `preprocessed_message` must be output of `normalize_text` (only a-z and
+    single spaces), so a plain `split()` yields the same tokens as the
+    vectorizer's token pattern; out-of-vocabulary and stop words are skipped.
+    """
+    counts = {}
+    for token in preprocessed_message.split():
+        if token in term_weights:
+            counts[token] = counts.get(token, 0) + 1
+
+    dot = 0.0
+    norm_sq = 0.0
+    for token, count in counts.items():
+        idf, weight = term_weights[token]
+        dot += count * weight
+        norm_sq += (count * idf) ** 2
+
+    z = intercept + (dot / math.sqrt(norm_sq) if norm_sq else 0.0)
+    # Numerically stable logistic function
+    if z >= 0:
+        return 1.0 / (1.0 + math.exp(-z))
+    e = math.exp(z)
+    return e / (1.0 + e)
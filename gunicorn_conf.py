@@ -0,0 +1,18 @@
+# scam_text_api/gunicorn_conf.py
+#
+# Production server config. Run from the project root with:
+#   gunicorn -c gunicorn_conf.py app.app:app
+
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+
+# Load the app (and with it model.pkl / vectorizer.pkl) once in the master
+# process before forking, so workers share the model pages copy-on-write
+# instead of each holding its own copy.
+preload_app = True
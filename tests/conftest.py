@@ -0,0 +1,6 @@
+import os
+import sys
+
+# The app modules import each other as top-level modules (see app/app.py)
+APP_DIR = os.path.join(os.path.dirname(__file__), '..', 'app')
+sys.path.insert(0, APP_DIR)
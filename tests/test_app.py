@@ -0,0 +1,67 @@
+import warnings
+
+import pytest
+
+with warnings.catch_warnings():
+    # The pickles may come from a slightly different scikit-learn version
+    warnings.simplefilter('ignore')
+    import app as app_module
+
+from inference import predict_scam
+
+SCAM_MESSAGE = 'urgent your bank account is blocked click the link to verify now'
+
+
+@pytest.fixture
+def client():
+    return app_module.app.test_client()
+
+
+@pytest.mark.parametrize('endpoint', ['/predict', '/predict_batch'])
+@pytest.mark.parametrize('body', ['[1, 2]', 'null', '"text"', '3'])
+def test_non_object_body_is_rejected(client, endpoint, body):
+    response = client.post(endpoint, data=body, content_type='application/json')
+
+    assert response.status_code == 400
+    assert response.get_json() == {"error": "Request body must be a JSON object"}
+
+
+@pytest.mark.parametrize('payload, error', [
+    ({}, "Missing 'messages' field in request body"),
+    ({'messages': []}, "'messages' field must not be empty"),
+    ({'messages': 'hi'}, "'messages' field must be a list of strings"),
+    ({'messages': {'a': 'hi'}}, "'messages' field must be a list of strings"),
+    ({'messages': ['hi', 3]}, "'messages' field must be a list of strings"),
+    ({'messages': ['hi', None]}, "'messages' field must be a list of strings"),
+])
+def test_predict_batch_validation(client, payload, error):
+    response = client.post('/predict_batch', json=payload)
+
+    assert response.status_code == 400
+    assert response.get_json() == {"error": error}
+
+
+def test_predict_batch_size_limit(client, monkeypatch):
+    monkeypatch.setattr(app_module, 'MAX_BATCH_SIZE', 2)
+
+    assert client.post('/predict_batch', json={'messages': ['a', 'b']}).status_code == 200
+    response = client.post('/predict_batch', json={'messages': ['a', 'b', 'c']})
+    assert response.status_code == 400
+    assert response.get_json() == {"error": "'messages' must contain at most 2 items"}
+
+
+def test_predict_batch_keeps_input_order(client):
+    # Rule hits and ML-scored messages interleaved
+    messages = ['hi', SCAM_MESSAGE, 'on my way', 'you have won a lottery claim your prize now', '']
+
+    response = client.post('/predict_batch', json={'messages': messages})
+
+    assert response.status_code == 200
+    results = response.get_json()['results']
+    assert len(results) == len(messages)
+    for message, result in zip(messages, results):
+        label, confidence, reason = predict_scam(message)
+        assert result == {"prediction": label, "confidence": confidence, "reason": reason}
+    assert results[1]['prediction'] == 'SCAM'
+    assert results[1]['reason'].startswith('Highly likely SCAM')
+    assert results[2]['reason'] == 'Classified as SAFE by rule-based override.'
@@ -0,0 +1,67 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from batching import MicroBatcher
+
+
+def test_each_caller_gets_its_own_result_under_concurrency():
+    batch_sizes = []
+
+    def double(items):
+        batch_sizes.append(len(items))
+        return [x * 2 for x in items]
+
+    batcher = MicroBatcher(double, batch_size=8, max_latency=0.02)
+    with ThreadPoolExecutor(20) as pool:
+        results = list(pool.map(batcher.predict, range(100)))
+
+    assert results == [x * 2 for x in range(100)]
+    assert sum(batch_sizes) == 100
+    assert max(batch_sizes) <= 8
+    # Concurrent submissions were actually coalesced
+    assert len(batch_sizes) < 100
+
+
+def test_exception_is_propagated_to_every_caller():
+    def fail(items):
+        raise RuntimeError("scoring failed")
+
+    batcher = MicroBatcher(fail, batch_size=8, max_latency=0.05)
+    futures = [batcher.submit(i) for i in range(5)]
+
+    for future in futures:
+        with pytest.raises(RuntimeError, match="scoring failed"):
+            future.result(timeout=2)
+
+
+def test_short_result_list_fails_every_caller():
+    batcher = MicroBatcher(lambda items: items[:-1], batch_size=8, max_latency=0.05)
+    futures = [batcher.submit(i) for i in range(3)]
+
+    for future in futures:
+        with pytest.raises(ValueError):
+            future.result(timeout=2)
+
+
+def test_full_batch_is_flushed_without_waiting_for_latency():
+    batches = []
+    batcher = MicroBatcher(lambda items: batches.append(list(items)) or items,
+                           batch_size=4, max_latency=5.0)
+
+    start = time.monotonic()
+    futures = [batcher.submit(i) for i in range(4)]
+    assert [f.result(timeout=2) for f in futures] == [0, 1, 2, 3]
+
+    assert time.monotonic() - start < 1.0
+    assert batches == [[0, 1, 2, 3]]
+
+
+def test_partial_batch_is_flushed_after_max_latency():
+    batcher = MicroBatcher(lambda items: items, batch_size=32, max_latency=0.1)
+
+    start = time.monotonic()
+    assert batcher.submit("only").result(timeout=2) == "only"
+
+    assert 0.1 <= time.monotonic() - start < 1.0
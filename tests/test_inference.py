@@ -0,0 +1,21 @@
+import warnings
+
+import pytest
+
+with warnings.catch_warnings():
+    # The pickles may come from a slightly different scikit-learn version
+    warnings.simplefilter('ignore')
+    import inference
+
+
+@pytest.mark.parametrize('rule_result, expected', [
+    (('SAFE', 0.99), inference._SAFE_GREETING),
+    (('SAFE', 0.98), inference._SAFE_SHORT),
+    (('SAFE', 0.97), ('SAFE', 0.97, 'Classified as SAFE by rule-based override.')),
+    (('SCAM', 0.9), ('SCAM', 0.9, 'Classified as SCAM by rule-based override.')),
+])
+def test_rule_outcomes(monkeypatch, rule_result, expected):
+    monkeypatch.setattr(inference, 'apply_rules_normalized', lambda text: rule_result)
+
+    assert inference._rule_prediction('anything') == expected
+    assert inference.predict_scam_batch(['anything']) == [expected]
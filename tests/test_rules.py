@@ -0,0 +1,92 @@
+import re
+
+import pytest
+
+import rules
+from rules import apply_rules, normalize_text
+
+
+def _regex_normalize(text):
+    # The original regex pipeline that `normalize_text` must keep matching
+    text = text.lower()
+    text = re.sub(r'[^a-z\s]', '', text)
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+@pytest.mark.parametrize('text', [
+    '',
+    '   ',
+    'Hello World',
+    'URGENT!! Your bank account #1234 is blocked. Click http://x.co now.',
+    "I'm on my way :)",
+    'tabs\tand\nnewlines\r\nand\x0bvertical\x0cfeeds',
+    # \x1c-\x1f are whitespace to str.split() but not to bytes.split()
+    'file\x1cgroup\x1drecord\x1eunit\x1fseparators',
+    '\x1c\x1d leading and trailing \x1e\x1f',
+    'control\x00\x07\x7fchars',
+    'café naïve résumé',
+    'Ünïcödé ÀÉÎÕÜ letters',
+    '你好 world',
+    'emoji 😀 in text',
+    'KELVIN K sign',
+    'dotted İ capital',
+    'non breaking em　ideographic line\u0085next',
+])
+def test_normalize_text_matches_regex_pipeline(text):
+    assert normalize_text(text) == _regex_normalize(text)
+
+
+def test_normalize_text_matches_regex_pipeline_on_long_text():
+    text = 'Mixed ASCII \x1c and ünïcode text! ' * 40
+    assert len(text) > rules.MAX_CACHED_MESSAGE_LENGTH
+    assert normalize_text(text) == _regex_normalize(text)
+
+
+def _loop_apply_rules(text):
+    # The original per-phrase loop semantics that the combined automaton replaces
+    normalized_text = _regex_normalize(text)
+    if normalized_text in rules.GREETINGS:
+        return "SAFE", 0.99
+    words = normalized_text.split()
+    if len(words) <= 6 and all(word in rules.GREETING_WORDS for word in words):
+        return "SAFE", 0.99
+    for phrase in rules.GENUINE_MESSAGES:
+        if phrase in normalized_text:
+            return "SAFE", 0.99
+    if len(words) <= 3 or len(normalized_text) < rules.MIN_SAFE_LENGTH:
+        if any(keyword in normalized_text for keyword in rules.SCAM_KEYWORDS):
+            return None
+        return "SAFE", 0.98
+    return None
+
+
+@pytest.mark.parametrize('text', [
+    # In both GENUINE_MESSAGES and SCAM_KEYWORDS: the genuine rule wins
+    'congratulations',
+    'Congratulations on the new job, so proud of you all',
+    # Genuine phrase that contains a scam keyword ("update")
+    'thanks for the update',
+    'Thanks for the update on the project timeline, talk soon',
+    # Scam keyword inside another word ("pin" in "happiness")
+    'happiness',
+    'pure happiness',
+    'so much happiness and joy today friends',
+    # Short messages with and without scam keywords
+    'otp',
+    'verify now',
+    'cool',
+    'nope not today',
+    # Longer messages with no genuine phrase
+    'your account has been suspended please verify your identity',
+    'lets grab dinner at the new place downtown tonight',
+    '',
+    'hi there',
+])
+def test_apply_rules_matches_loop_semantics(text):
+    assert apply_rules(text) == _loop_apply_rules(text)
+
+
+def test_shared_phrase_is_tagged_genuine():
+    assert "congratulations" in rules.GENUINE_MESSAGES
+    assert "congratulations" in rules.SCAM_KEYWORDS
+    assert rules._AUTOMATON.get("congratulations") == rules._GENUINE
@@ -0,0 +1,115 @@
+import copy
+import os
+import random
+import warnings
+
+import joblib
+import numpy as np
+import pytest
+
+from sklearn.feature_extraction.text import CountVectorizer
+
+from rules import normalize_text
+from scoring import build_term_index, build_term_weights, score_message, vectorize_batch
+
+APP_DIR = os.path.join(os.path.dirname(__file__), '..', 'app')
+
+
+@pytest.fixture(scope='module')
+def fitted():
+    with warnings.catch_warnings():
+        # The pickles may come from a slightly different scikit-learn version
+        warnings.simplefilter('ignore')
+        model = joblib.load(os.path.join(APP_DIR, 'model.pkl'))
+        vectorizer = joblib.load(os.path.join(APP_DIR, 'vectorizer.pkl'))
+    return model, vectorizer
+
+
+@pytest.fixture(scope='module')
+def messages(fitted):
+    _, vectorizer = fitted
+    vocab = sorted(vectorizer.vocabulary_)
+    # Stop words, one-letter words and out-of-vocabulary words must all be skipped
+    extra = ['the', 'a', 'is', 'on', 'zzzqx', 'i', 'won', 'won']
+    rng = random.Random(0)
+    generated = [
+        ' '.join(rng.choice(vocab + extra) for _ in range(rng.randint(0, 25)))
+        for _ in range(500)
+    ]
+    raw = [
+        '',
+        '!!!',
+        'URGENT!! Your bank account #1234 is blocked. Click http://x.co to verify now.',
+        'You have won a lottery, click here to claim your prize prize prize!',
+        'Please send me the report for the meeting tomorrow evening',
+    ]
+    return [normalize_text(m) for m in raw + generated]
+
+
+def test_score_message_matches_sklearn(fitted, messages):
+    model, vectorizer = fitted
+    expected = model.predict_proba(vectorizer.transform(messages))[:, 1]
+
+    term_weights = build_term_weights(vectorizer, model)
+    intercept = float(model.intercept_[0])
+    actual = np.array([score_message(m, term_weights, intercept) for m in messages])
+
+    np.testing.assert_allclose(actual, expected, rtol=0, atol=1e-9)
+
+
+def test_served_float32_scorers_match_float64_sklearn(fitted, messages):
+    # `inference` casts the weights to float32 in `_install_models` at import
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        import inference
+    assert inference.model.coef_.dtype == np.float32
+
+    model, vectorizer = fitted
+    expected = model.predict_proba(vectorizer.transform(messages))
+
+    single = np.array([inference._score_one(m) for m in messages])
+    batch = inference._score_batch(messages)
+
+    np.testing.assert_allclose(single, expected, rtol=0, atol=1e-6)
+    np.testing.assert_allclose(batch, expected, rtol=0, atol=1e-6)
+
+
+def test_vectorize_batch_matches_transform(fitted, messages):
+    model, vectorizer = fitted
+    expected = vectorizer.transform(messages)
+
+    X = vectorize_batch(messages, build_term_index(vectorizer), len(vectorizer.vocabulary_))
+
+    assert X.shape == expected.shape
+    np.testing.assert_allclose(X.toarray(), expected.toarray(), rtol=0, atol=1e-6)
+    np.testing.assert_allclose(
+        model.predict_proba(X), model.predict_proba(expected), rtol=0, atol=1e-6
+    )
+
+
+@pytest.mark.parametrize('params', [
+    {'tokenizer': str.split},
+    {'preprocessor': str.lower},
+    {'token_pattern': r'(?u)\b\w+\b'},
+    {'ngram_range': (1, 2)},
+    {'sublinear_tf': True},
+    {'norm': 'l1'},
+])
+def test_unsupported_vectorizer_rejected(fitted, params):
+    model, vectorizer = fitted
+    changed = copy.deepcopy(vectorizer).set_params(**params)
+
+    with pytest.raises(ValueError):
+        build_term_weights(changed, model)
+    with pytest.raises(ValueError):
+        build_term_index(changed)
+
+
+def test_count_vectorizer_rejected(fitted, messages):
+    model, _ = fitted
+    counts = CountVectorizer().fit(messages)
+
+    with pytest.raises(ValueError):
+        build_term_weights(counts, model)
+    with pytest.raises(ValueError):
+        build_term_index(counts)